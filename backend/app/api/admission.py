@@ -0,0 +1,246 @@
+"""Inbound admission control: per-client rate limits and per-route concurrency budgets.
+
+Requests are classified by route into cheap reads, uploads/parsing and LLM
+analysis. Each request needs a free slot in its class's concurrency budget and
+then spends tokens (weighted by class) from a per-IP and a per-session token
+bucket. When either is exhausted the request is rejected immediately with 503
+or 429 and a ``Retry-After`` header instead of queueing. ``/api/health`` is
+never limited.
+"""
+
+import json
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SESSION_PATH = re.compile(r"^/api/sessions/([^/]+)")
+_MAX_BUFFERED_BODY = 256 * 1024
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens per second."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, cost: float, now: float) -> float:
+        """Take ``cost`` tokens. Returns 0 on success, else seconds until possible."""
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class RouteClass:
+    """A group of routes sharing a token cost and a concurrency budget."""
+
+    name: str
+    cost: float
+    max_concurrency: int
+    in_flight: int = 0
+
+
+class AdmissionController:
+    """Tracks client token buckets and per-class in-flight requests."""
+
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        self.route_classes = {
+            "read": RouteClass("read", 1, settings.admission_read_concurrency),
+            "upload": RouteClass("upload", 3, settings.admission_upload_concurrency),
+            "llm": RouteClass("llm", 5, settings.admission_llm_concurrency),
+        }
+        self._ip_buckets: dict[str, TokenBucket] = {}
+        self._session_buckets: dict[str, TokenBucket] = {}
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        """Map a request to its route class; None means never limited."""
+        if path == "/api/health" or method == "OPTIONS":
+            return None
+        if path.startswith("/api/analyze/") or path == "/api/jds/search":
+            return self.route_classes["llm"]
+        # Session creation scans the sessions directory, so it is not a cheap read
+        if method == "POST" and (
+            path in ("/api/sessions", "/api/jds") or path.endswith("/resume")
+        ):
+            return self.route_classes["upload"]
+        return self.route_classes["read"]
+
+    def _bucket(
+        self, buckets: dict[str, TokenBucket], key: str, per_minute: float, burst: float, now: float
+    ) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.MAX_BUCKETS:
+                # Idle clients have refilled to capacity and carry no state
+                for stale in [k for k, b in buckets.items() if b.is_full(now)]:
+                    del buckets[stale]
+            bucket = buckets[key] = TokenBucket(per_minute / 60.0, burst, now)
+        return bucket
+
+    def check_rate(self, client_ip: str, session_id: Optional[str], cost: float) -> float:
+        """Charge the client's buckets. Returns 0 if allowed, else Retry-After seconds."""
+        now = time.monotonic()
+        ip_bucket = self._bucket(
+            self._ip_buckets, client_ip,
+            settings.admission_ip_rate_per_minute, settings.admission_ip_burst, now,
+        )
+        wait = ip_bucket.try_take(cost, now)
+        if wait or not session_id:
+            return wait
+
+        session_bucket = self._bucket(
+            self._session_buckets, session_id,
+            settings.admission_session_rate_per_minute, settings.admission_session_burst, now,
+        )
+        wait = session_bucket.try_take(cost, now)
+        if wait:
+            # Refund the IP bucket: the request was not admitted
+            ip_bucket.tokens = min(ip_bucket.capacity, ip_bucket.tokens + cost)
+        return wait
+
+    def try_acquire(self, route_class: RouteClass) -> bool:
+        if route_class.in_flight >= route_class.max_concurrency:
+            return False
+        route_class.in_flight += 1
+        return True
+
+    def release(self, route_class: RouteClass) -> None:
+        route_class.in_flight -= 1
+
+
+async def _send_rejection(send: Send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _client_ip(scope: Scope) -> str:
+    """Client address, trusting only X-Forwarded-For entries added by our proxies.
+
+    Each trusted proxy appends the address it received the request from, so
+    with N proxy hops the client is the Nth entry from the right. Anything to
+    the left of that was written by the client and is ignored.
+    """
+    hops = settings.admission_trusted_proxy_hops
+    if hops > 0:
+        entries: list[str] = []
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                entries.extend(e.strip() for e in value.decode("latin-1").split(","))
+        entries = [e for e in entries if e]
+        if entries:
+            return entries[-min(hops, len(entries))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds load before it reaches the route handlers."""
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Check capacity first so shed requests do not also spend rate tokens
+        if not self.controller.try_acquire(route_class):
+            logger.warning(f"Shedding {route_class.name} request: concurrency budget full")
+            await _send_rejection(
+                send, 503, "Server busy, please retry later", settings.admission_busy_retry_after
+            )
+            return
+
+        try:
+            session_id = None
+            match = _SESSION_PATH.match(scope["path"])
+            if match:
+                session_id = match.group(1)
+            elif route_class.name == "llm" and scope["method"] == "POST":
+                session_id, receive = await self._peek_session_id(receive)
+
+            client_ip = _client_ip(scope)
+            retry_after = self.controller.check_rate(client_ip, session_id, route_class.cost)
+            if retry_after:
+                logger.info(f"Rate limited {route_class.name} request from {client_ip}")
+                await _send_rejection(
+                    send, 429, "Too many requests, please retry later", retry_after
+                )
+                return
+
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+    async def _peek_session_id(self, receive: Receive) -> tuple[Optional[str], Receive]:
+        """Read a small JSON body to find its session_id, then replay it downstream."""
+        messages: list[Message] = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body") or len(body) > _MAX_BUFFERED_BODY:
+                break
+
+        session_id = None
+        if len(body) <= _MAX_BUFFERED_BODY:
+            try:
+                payload = json.loads(body)
+                if isinstance(payload, dict) and isinstance(payload.get("session_id"), str):
+                    session_id = payload["session_id"]
+            except ValueError:
+                pass
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return session_id, replay
@@ -1,23 +1,121 @@
 """API route definitions."""
 
+import asyncio
+import gzip
 import logging
-from fastapi import APIRouter, File, Header, HTTPException, UploadFile
-from typing import Optional
+from contextlib import suppress
+from fastapi import APIRouter, File, Header, HTTPException, Request, Response, UploadFile
+from typing import Awaitable, Optional, TypeVar
 
 from app.schemas import (
+    AnalysisListResponse,
+    AnalysisSummary,
     HealthResponse,
     JdGapRequest,
     JdGapResult,
+    JdIngestRequest,
+    JdIngestResponse,
+    JdSearchRequest,
+    JdSearchResponse,
+    MetricsResponse,
     ResumeUploadResponse,
     SessionResponse,
 )
 from app.services.jd_gap_service import jd_gap_service
+from app.services.jd_match_service import jd_match_service
 from app.services.resume_service import resume_service
+from app.infra.metrics import llm_metrics
 from app.infra.session_store import session_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+T = TypeVar("T")
+
+# Non-standard status (as used by nginx) for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready."""
+
+
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work``, cancelling it if the client disconnects first."""
+    task = asyncio.ensure_future(work)
+
+    async def wait_for_disconnect() -> None:
+        # The body has already been read, so the next message is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if task not in done:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        llm_metrics.requests_cancelled += 1
+        logger.info(f"Client disconnected, cancelled {request.url.path}")
+        raise ClientDisconnected()
+    return task.result()
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Whether Accept-Encoding allows gzip (explicitly or via ``*``) with q > 0."""
+    qualities: dict[str, float] = {}
+    for item in request.headers.get("accept-encoding", "").lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.strip()] = q
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _json_response(
+    request: Request,
+    body: Optional[bytes] = None,
+    gzipped: Optional[bytes] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Send a JSON body (given plain or pre-compressed), gzip-encoded if accepted."""
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    if _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        content = gzipped if gzipped is not None else gzip.compress(body)
+    else:
+        content = body if body is not None else gzip.decompress(gzipped)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match, ignoring the encoding suffix."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        candidate = candidate.removeprefix("W/").strip('"').removesuffix("-gzip")
+        if candidate == etag:
+            return True
+    return False
+
 
 # ============================================
 # Health
@@ -29,6 +127,12 @@ async def health_check():
     return HealthResponse()
 
 
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics():
+    """LLM usage and cancellation counters since process start."""
+    return MetricsResponse(**llm_metrics.snapshot())
+
+
 # ============================================
 # Sessions
 # ============================================
@@ -120,6 +224,7 @@ async def upload_resume(session_id: str, file: UploadFile = File(...)):
 @router.post("/analyze/jd-gap", response_model=JdGapResult)
 async def analyze_jd_gap(
     request: JdGapRequest,
+    http_request: Request,
     x_openai_key: Optional[str] = Header(None, alias="X-OpenAI-Key"),
 ):
     """Analyze gap between resume and JD."""
@@ -137,17 +242,115 @@ async def analyze_jd_gap(
 
     # Run analysis with user-provided or env API key
     try:
-        result = await jd_gap_service.analyze(
-            resume_text=resume_text,
-            jd_text=request.jd_text,
-            target_role=request.target_role,
-            api_key=x_openai_key,
+        result = await _cancel_on_disconnect(
+            http_request,
+            jd_gap_service.analyze_incremental(
+                session_id=request.session_id,
+                resume_text=resume_text,
+                jd_text=request.jd_text,
+                target_role=request.target_role,
+                api_key=x_openai_key,
+            ),
         )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except ValueError as e:
         # API key missing or invalid
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-    return result
+    return _json_response(http_request, result.model_dump_json().encode("utf-8"))
+
+
+@router.get("/sessions/{session_id}/analyses", response_model=AnalysisListResponse)
+async def list_analyses(session_id: str):
+    """List the analyses stored for a session."""
+    session = session_store.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return AnalysisListResponse(
+        session_id=session_id,
+        analyses=[AnalysisSummary(**entry) for entry in session_store.list_analyses(session_id)],
+    )
+
+
+@router.get("/sessions/{session_id}/analyses/{analysis_id}", response_model=JdGapResult)
+async def get_analysis(
+    session_id: str,
+    analysis_id: str,
+    request: Request,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """Fetch a stored analysis. Supports conditional requests via ETag."""
+    session = session_store.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+    meta = session_store.get_analysis_meta(session_id, analysis_id)
+    if not meta:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    # Strong validators differ per content-coding
+    etag = meta["etag"] + ("-gzip" if _accepts_gzip(request) else "")
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, meta["etag"]):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept-Encoding"})
+
+    gzipped = session_store.load_analysis_body(session_id, analysis_id)
+    if gzipped is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return _json_response(request, gzipped=gzipped, headers=headers)
+
+
+
+# ============================================
+# JD Corpus
+# ============================================
+
+@router.post("/jds", response_model=JdIngestResponse)
+def ingest_jds(request: JdIngestRequest):
+    """Add job descriptions to the local JD index.
+
+    Tokenizing and rewriting the index is CPU and disk bound, so this is a
+    plain ``def`` route and runs in the threadpool, off the event loop.
+    """
+    return jd_match_service.ingest(request.jds)
+
 
+@router.post("/jds/search", response_model=JdSearchResponse)
+async def search_jds(
+    request: JdSearchRequest,
+    http_request: Request,
+    x_openai_key: Optional[str] = Header(None, alias="X-OpenAI-Key"),
+):
+    """Find the stored JDs that best match the session's resume."""
+    session = session_store.get_session(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+    if not session.has_resume:
+        raise HTTPException(status_code=400, detail="Please upload a resume first")
+
+    resume_text = session_store.load_resume_text(request.session_id)
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="Resume text not found")
+
+    try:
+        return await _cancel_on_disconnect(
+            http_request,
+            jd_match_service.search(
+                session_id=request.session_id,
+                resume_text=resume_text,
+                top_k=request.top_k,
+                analyze_top=request.analyze_top,
+                target_role=request.target_role,
+                api_key=x_openai_key,
+            ),
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
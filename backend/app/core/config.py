@@ -21,6 +21,36 @@ class Settings(BaseSettings):
     session_ttl_hours: int = 24
     data_dir: Path = Path("./data")
 
+    # Incremental re-analysis: fall back to a full analysis when more than
+    # this share of the resume (by characters) changed since the last run
+    incremental_max_changed_ratio: float = 0.5
+    # Cap on changed-section text sent with a delta re-analysis
+    incremental_changed_chars: int = 8000
+
+    # Process-wide cap on concurrent upstream OpenAI requests
+    openai_max_concurrency: int = 16
+
+    # Chunked analysis: JDs longer than this are split and analyzed in parallel
+    analysis_chunk_chars: int = 8000
+    # Resumes longer than this are condensed (every section kept, each shortened)
+    analysis_resume_chars: int = 12000
+
+    # JD corpus index
+    jd_index_dim: int = 512
+
+    # Admission control (rate limits are in weighted tokens: read=1, upload=3, llm=5)
+    admission_enabled: bool = True
+    admission_ip_rate_per_minute: float = 240
+    admission_ip_burst: float = 60
+    admission_session_rate_per_minute: float = 60
+    admission_session_burst: float = 20
+    admission_read_concurrency: int = 64
+    admission_upload_concurrency: int = 8
+    admission_llm_concurrency: int = 16
+    admission_busy_retry_after: float = 2
+    # Number of reverse proxies that append to X-Forwarded-For (0 = ignore the header)
+    admission_trusted_proxy_hops: int = 0
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8002
@@ -29,6 +59,10 @@ class Settings(BaseSettings):
     def sessions_dir(self) -> Path:
         return self.data_dir / "sessions"
 
+    @property
+    def jd_index_dir(self) -> Path:
+        return self.data_dir / "jd_index"
+
 
 settings = Settings()
 
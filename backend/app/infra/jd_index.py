@@ -0,0 +1,421 @@
+"""Persistent local index of job descriptions for fast resume-to-JD search.
+
+Layout under ``settings.jd_index_dir``:
+
+- ``docs.jsonl``      one JSON line per JD with its full text (append-only), read on demand
+- ``records.jsonl``   one metadata line per JD (append-only); the only log parsed at startup
+- ``vectors.f32``     float32 rows (capacity x dim), grown in place and memory-mapped
+- ``inverted.json``   compacted term -> document ids, covering the first ``n_docs`` JDs
+- ``postings.jsonl``  posting additions per ingest since the last compaction (append-only)
+
+Vectors are computed locally with feature hashing, so no embedding service is
+needed and vectors never have to be recomputed as the corpus grows. An ingest
+only appends, so its cost does not grow with the corpus; the record lines are
+written last and mark the JDs as committed.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LATIN_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_CJK_RUN = re.compile(r"[\u4e00-\u9fff]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "our", "that", "the", "this", "to", "we", "will",
+    "with", "you", "your", "all", "can", "have", "has", "who", "years", "year",
+    "work", "team", "experience", "including", "etc", "able", "strong",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into latin word tokens and CJK character bigrams."""
+    text = text.lower()
+    tokens = []
+    for match in _LATIN_TOKEN.findall(text):
+        token = match.rstrip(".")
+        if len(token) > 1 and token not in STOPWORDS:
+            tokens.append(token)
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def embed(tokens: list[str], dim: int) -> np.ndarray:
+    """Hash token counts into a fixed-size, L2-normalized vector."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, count in Counter(tokens).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + math.log(count))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+@dataclass
+class JdRecord:
+    """Metadata for an indexed JD; the text stays on disk."""
+
+    jd_id: str
+    doc_id: int
+    title: Optional[str]
+    company: Optional[str]
+    chars: int
+    offset: int
+
+
+@dataclass
+class JdHit:
+    """A search hit with its combined and component scores."""
+
+    record: JdRecord
+    score: float
+    vector_score: float
+    keyword_score: float
+    matched_keywords: list[str]
+
+
+class JdIndex:
+    """Inverted keyword index plus memory-mapped hashed vectors over stored JDs."""
+
+    # Vector rows allocated up front; capacity doubles when full
+    INITIAL_CAPACITY = 1024
+    # Fold posting deltas into inverted.json once they outgrow it (and this)
+    COMPACT_MIN_BYTES = 1 << 20
+
+    def __init__(self, index_dir: Optional[Path] = None, dim: Optional[int] = None):
+        self.index_dir = index_dir or settings.jd_index_dir
+        self.dim = dim or settings.jd_index_dim
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._records: list[JdRecord] = []
+        self._by_id: dict[str, JdRecord] = {}
+        self._inverted: dict[str, list[int]] = {}
+        self._vectors: Optional[np.ndarray] = None
+        # Committed sizes of the append-only logs; anything past them is a torn write
+        self._records_size = 0
+        self._postings_size = 0
+
+    @property
+    def _docs_path(self) -> Path:
+        return self.index_dir / "docs.jsonl"
+
+    @property
+    def _records_path(self) -> Path:
+        return self.index_dir / "records.jsonl"
+
+    @property
+    def _inverted_path(self) -> Path:
+        return self.index_dir / "inverted.json"
+
+    @property
+    def _postings_path(self) -> Path:
+        return self.index_dir / "postings.jsonl"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.index_dir / "vectors.f32"
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            row_bytes = self.dim * 4
+            if self._vectors_path.exists() and self._vectors_path.stat().st_size >= row_bytes:
+                self._vectors = np.memmap(
+                    self._vectors_path,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(self._vectors_path.stat().st_size // row_bytes, self.dim),
+                )
+            capacity = self._vectors.shape[0] if self._vectors is not None else 0
+            self._load_records(capacity)
+            self._load_inverted()
+            self._loaded = True
+
+    def _load_records(self, capacity: int) -> None:
+        """Read committed record metadata, dropping a torn tail or rows without vectors."""
+        if not self._records_path.exists():
+            return
+        valid_bytes = 0
+        with open(self._records_path, "rb") as f:
+            for line in f:
+                # Every record needs a vector row at the same position
+                if len(self._records) >= capacity:
+                    break
+                try:
+                    meta = json.loads(line)
+                except ValueError:
+                    break
+                record = JdRecord(doc_id=len(self._records), **meta)
+                self._records.append(record)
+                self._by_id[record.jd_id] = record
+                valid_bytes += len(line)
+        if self._records_path.stat().st_size != valid_bytes:
+            logger.warning(f"JD index log has a torn tail, truncating to {len(self._records)}")
+            with open(self._records_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        self._records_size = valid_bytes
+
+    def _load_inverted(self) -> None:
+        """Load the compacted index and replay posting batches whose records committed."""
+        covered = 0
+        if self._inverted_path.exists():
+            with open(self._inverted_path, "r", encoding="utf-8") as f:
+                base = json.load(f)
+            covered = base["n_docs"]
+            self._inverted = base["postings"]
+        if not self._postings_path.exists():
+            return
+
+        valid_bytes = 0
+        with open(self._postings_path, "rb") as f:
+            for line in f:
+                try:
+                    batch = json.loads(line)
+                except ValueError:
+                    break
+                first = batch["first_doc_id"]
+                jd_ids = batch["jd_ids"]
+                # An ingest that failed before its records were written never committed
+                if any(
+                    doc_id >= len(self._records) or self._records[doc_id].jd_id != jd_id
+                    for doc_id, jd_id in enumerate(jd_ids, start=first)
+                ):
+                    break
+                # Batches already folded into inverted.json by an interrupted compaction
+                if first >= covered:
+                    for term, doc_ids in batch["postings"].items():
+                        self._inverted.setdefault(term, []).extend(doc_ids)
+                valid_bytes += len(line)
+        if self._postings_path.stat().st_size != valid_bytes:
+            logger.warning("JD index posting log has an uncommitted batch, truncating")
+            with open(self._postings_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        self._postings_size = valid_bytes
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._records)
+
+    def add(self, items: list[dict]) -> list[str]:
+        """Index JDs given as dicts with ``text`` and optional ``title``/``company``.
+
+        Texts, vector rows and posting additions are written before the record
+        lines, so a failed ingest never leaves records without their data. Its
+        leftovers are overwritten or truncated by the next ingest.
+        """
+        self._ensure_loaded()
+        if not items:
+            return []
+        with self._lock:
+            first_doc_id = len(self._records)
+            docs = [{**item, "jd_id": uuid.uuid4().hex} for item in items]
+            additions: dict[str, list[int]] = {}
+            new_vectors = []
+            for doc_id, doc in enumerate(docs, start=first_doc_id):
+                tokens = tokenize(doc["text"])
+                for term in set(tokens):
+                    additions.setdefault(term, []).append(doc_id)
+                new_vectors.append(embed(tokens, self.dim))
+
+            records = []
+            with open(self._docs_path, "ab") as f:
+                for doc_id, doc in enumerate(docs, start=first_doc_id):
+                    offset = f.tell()
+                    line = json.dumps(
+                        {"jd_id": doc["jd_id"], "text": doc["text"]}, ensure_ascii=False
+                    )
+                    f.write(line.encode("utf-8") + b"\n")
+                    records.append(
+                        JdRecord(
+                            jd_id=doc["jd_id"],
+                            doc_id=doc_id,
+                            title=doc.get("title"),
+                            company=doc.get("company"),
+                            chars=len(doc["text"]),
+                            offset=offset,
+                        )
+                    )
+
+            self._write_vectors(first_doc_id, np.stack(new_vectors))
+            postings_line = json.dumps(
+                {
+                    "first_doc_id": first_doc_id,
+                    "jd_ids": [doc["jd_id"] for doc in docs],
+                    "postings": additions,
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            postings_size = self._append(
+                self._postings_path, self._postings_size, postings_line.encode("utf-8") + b"\n"
+            )
+            record_lines = b"".join(
+                json.dumps(
+                    {
+                        "jd_id": r.jd_id,
+                        "title": r.title,
+                        "company": r.company,
+                        "chars": r.chars,
+                        "offset": r.offset,
+                    },
+                    ensure_ascii=False,
+                ).encode("utf-8")
+                + b"\n"
+                for r in records
+            )
+            self._records_size = self._append(self._records_path, self._records_size, record_lines)
+            self._postings_size = postings_size
+
+            # Searches ignore postings for ids past the published records
+            for term, doc_ids in additions.items():
+                self._inverted.setdefault(term, []).extend(doc_ids)
+            for record in records:
+                self._records.append(record)
+                self._by_id[record.jd_id] = record
+
+            if self._postings_size > max(
+                self.COMPACT_MIN_BYTES,
+                self._inverted_path.stat().st_size if self._inverted_path.exists() else 0,
+            ):
+                self._compact()
+        return [doc["jd_id"] for doc in docs]
+
+    @staticmethod
+    def _append(path: Path, size: int, data: bytes) -> int:
+        """Write ``data`` at byte ``size`` of an append-only log, dropping any torn tail."""
+        with open(path, "ab") as f:
+            f.truncate(size)
+            f.write(data)
+        return size + len(data)
+
+    def _write_vectors(self, first_doc_id: int, new_vectors: np.ndarray) -> None:
+        """Write rows starting at ``first_doc_id``, growing the mapped file if needed."""
+        needed = first_doc_id + len(new_vectors)
+        vectors = self._vectors
+        capacity = vectors.shape[0] if vectors is not None else 0
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity, self.INITIAL_CAPACITY)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * self.dim * 4)
+            vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+        vectors[first_doc_id:needed] = new_vectors
+        vectors.flush()
+        # Publish the grown mapping in one assignment; searches keep their snapshot
+        self._vectors = vectors
+
+    def _compact(self) -> None:
+        """Fold the posting log into inverted.json and start a new log."""
+        tmp_inverted = self._inverted_path.with_suffix(".json.tmp")
+        with open(tmp_inverted, "w", encoding="utf-8") as f:
+            json.dump(
+                {"n_docs": len(self._records), "postings": self._inverted},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_inverted, self._inverted_path)
+        self._postings_size = self._append(self._postings_path, 0, b"")
+        logger.info(f"Compacted JD inverted index at {len(self._records)} documents")
+
+    def get(self, jd_id: str) -> Optional[JdRecord]:
+        self._ensure_loaded()
+        return self._by_id.get(jd_id)
+
+    def load_text(self, record: JdRecord) -> str:
+        """Read a JD's full text from the document log."""
+        with open(self._docs_path, "rb") as f:
+            f.seek(record.offset)
+            return json.loads(f.readline())["text"]
+
+    def search(self, query_text: str, top_k: int = 10, vector_weight: float = 0.7) -> list[JdHit]:
+        """Rank indexed JDs against a query (typically a resume).
+
+        Combines cosine similarity of hashed vectors with an IDF-weighted
+        keyword overlap score from the inverted index. CPU bound; call it from
+        a worker thread, not the event loop.
+        """
+        self._ensure_loaded()
+        vectors = self._vectors
+        if vectors is None:
+            return []
+        # Rows past the published records are spare capacity or an ingest in progress
+        n_docs = min(len(self._records), vectors.shape[0])
+        if n_docs == 0:
+            return []
+
+        tokens = tokenize(query_text)
+        vector_scores = np.asarray(vectors[:n_docs] @ embed(tokens, self.dim))
+
+        keyword_scores = np.zeros(n_docs, dtype=np.float32)
+        query_postings: dict[str, list[int]] = {}
+        for term in set(tokens):
+            postings = self._inverted.get(term)
+            if postings:
+                # Posting lists are ascending, so live ids form a prefix
+                postings = postings[: bisect.bisect_left(postings, n_docs)]
+            if postings:
+                query_postings[term] = postings
+                keyword_scores[postings] += math.log(1.0 + n_docs / len(postings))
+        max_keyword = float(keyword_scores.max())
+        if max_keyword > 0:
+            keyword_scores /= max_keyword
+
+        scores = vector_weight * vector_scores + (1.0 - vector_weight) * keyword_scores
+        k = min(top_k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        # Rarest shared terms first
+        rarest = sorted(query_postings, key=lambda t: len(query_postings[t]))
+        hits = []
+        for doc_id in top:
+            doc_id = int(doc_id)
+            matched = []
+            for term in rarest:
+                postings = query_postings[term]
+                i = bisect.bisect_left(postings, doc_id)
+                if i < len(postings) and postings[i] == doc_id:
+                    matched.append(term)
+                    if len(matched) == 15:
+                        break
+            hits.append(
+                JdHit(
+                    record=self._records[doc_id],
+                    score=float(scores[doc_id]),
+                    vector_score=float(vector_scores[doc_id]),
+                    keyword_score=float(keyword_scores[doc_id]),
+                    matched_keywords=matched,
+                )
+            )
+        return hits
+
+
+# Singleton instance
+jd_index = JdIndex()
@@ -0,0 +1,45 @@
+"""In-process counters for LLM usage and cancelled work."""
+
+from dataclasses import asdict, dataclass
+
+# Used as the estimate for a cancelled call before any call has completed
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+@dataclass
+class LlmMetrics:
+    """Counters since process start. Single event loop, so no locking needed."""
+
+    llm_calls_completed: int = 0
+    llm_calls_cancelled: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    requests_cancelled: int = 0
+    estimated_tokens_saved: int = 0
+
+    @property
+    def avg_completion_tokens(self) -> int:
+        if not self.llm_calls_completed:
+            return DEFAULT_COMPLETION_TOKENS
+        return self.completion_tokens // self.llm_calls_completed
+
+    def record_call(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.llm_calls_completed += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def record_cancelled_call(self) -> None:
+        """Count an upstream call abandoned mid-flight.
+
+        The completion it would have produced is estimated from the average of
+        completed calls; prompt tokens may already have been billed.
+        """
+        self.llm_calls_cancelled += 1
+        self.estimated_tokens_saved += self.avg_completion_tokens
+
+    def snapshot(self) -> dict:
+        return {**asdict(self), "avg_completion_tokens": self.avg_completion_tokens}
+
+
+# Singleton instance
+llm_metrics = LlmMetrics()
@@ -1,11 +1,13 @@
 """OpenAI API client wrapper."""
 
+import asyncio
 import json
 from typing import Any, Optional
 
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.infra.metrics import llm_metrics
 
 
 class OpenAIClient:
@@ -13,6 +15,9 @@ class OpenAIClient:
 
     def __init__(self):
         self._default_client: Optional[AsyncOpenAI] = None
+        # Shared by all requests, so fan-out (e.g. chunked analysis) cannot
+        # multiply the number of open upstream calls
+        self._semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
 
     def _get_client(self, api_key: Optional[str] = None) -> AsyncOpenAI:
         """Get OpenAI client with the specified or default API key."""
@@ -37,16 +42,27 @@ class OpenAIClient:
         max_tokens: int = 4096,
         api_key: Optional[str] = None,
     ) -> dict[str, Any]:
-        """Send chat completion request expecting JSON response."""
+        """Send chat completion request expecting JSON response.
+
+        Cancelling the awaiting task closes the HTTP request to OpenAI.
+        """
         client = self._get_client(api_key)
 
-        response = await client.chat.completions.create(
-            model=model or settings.openai_model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-        )
+        try:
+            async with self._semaphore:
+                response = await client.chat.completions.create(
+                    model=model or settings.openai_model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_format={"type": "json_object"},
+                )
+        except asyncio.CancelledError:
+            llm_metrics.record_cancelled_call()
+            raise
+
+        if response.usage:
+            llm_metrics.record_call(response.usage.prompt_tokens, response.usage.completion_tokens)
 
         content = response.choices[0].message.content or "{}"
         try:
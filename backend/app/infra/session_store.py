@@ -1,6 +1,9 @@
 """Session storage with filesystem-based temporary storage and TTL cleanup."""
 
+import gzip
+import hashlib
 import json
+import os
 import shutil
 import uuid
 from dataclasses import dataclass
@@ -40,6 +43,9 @@ class SessionStore:
     def _resume_text_path(self, session_id: str) -> Path:
         return self._session_path(session_id) / "resume.txt"
 
+    def _analyses_path(self, session_id: str) -> Path:
+        return self._session_path(session_id) / "analyses"
+
     def _load_meta(self, session_id: str) -> Optional[dict]:
         meta_path = self._meta_path(session_id)
         if not meta_path.exists():
@@ -134,6 +140,90 @@ class SessionStore:
         with open(path, "r", encoding="utf-8") as f:
             return f.read()
 
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write via a temp file and rename, so readers never see a partial file."""
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _analysis_index_path(self, session_id: str) -> Path:
+        return self._analyses_path(session_id) / "index.json"
+
+    def _load_analysis_index(self, session_id: str) -> dict:
+        path = self._analysis_index_path(session_id)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save_analysis(
+        self,
+        session_id: str,
+        analysis_id: str,
+        body: bytes,
+        resume_text: str,
+        meta: dict,
+    ) -> dict:
+        """Save an analysis result (JSON body) and the resume text it was based on.
+
+        Both are stored gzip-compressed; the result is kept exactly as served so
+        it can be sent without re-encoding. Returns the index entry, including
+        the strong ETag of the body.
+        """
+        analyses_path = self._analyses_path(session_id)
+        analyses_path.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(analyses_path / f"{analysis_id}.json.gz", gzip.compress(body, mtime=0))
+        self._write_atomic(
+            analyses_path / f"{analysis_id}.resume.txt.gz",
+            gzip.compress(resume_text.encode("utf-8"), mtime=0),
+        )
+
+        entry = {
+            **meta,
+            "analysis_id": analysis_id,
+            "etag": hashlib.sha256(body).hexdigest()[:32],
+        }
+        index = self._load_analysis_index(session_id)
+        index[analysis_id] = entry
+        self._write_atomic(
+            self._analysis_index_path(session_id),
+            json.dumps(index, ensure_ascii=False, indent=2, default=str).encode("utf-8"),
+        )
+        return entry
+
+    def list_analyses(self, session_id: str) -> list[dict]:
+        """List stored analyses for a session, newest first."""
+        index = self._load_analysis_index(session_id)
+        return sorted(index.values(), key=lambda e: e.get("created_at", ""), reverse=True)
+
+    def get_analysis_meta(self, session_id: str, analysis_id: str) -> Optional[dict]:
+        """Get the index entry (including ETag) of a stored analysis."""
+        return self._load_analysis_index(session_id).get(analysis_id)
+
+    def load_analysis_body(self, session_id: str, analysis_id: str) -> Optional[bytes]:
+        """Load a stored analysis result as gzip-compressed JSON."""
+        path = self._analyses_path(session_id) / f"{analysis_id}.json.gz"
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def load_analysis_resume_text(self, session_id: str, analysis_id: str) -> Optional[str]:
+        """Load the resume text a stored analysis was based on."""
+        path = self._analyses_path(session_id) / f"{analysis_id}.resume.txt.gz"
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
+
     def save_original_file(self, session_id: str, file_name: str, content: bytes) -> Path:
         """Save original resume file."""
         session_path = self._session_path(session_id)
@@ -6,6 +6,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admission import AdmissionMiddleware
 from app.api.routes import router
 from app.core.config import settings
 from app.infra.session_store import session_store
@@ -34,6 +35,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Rate limiting and load shedding (added first so CORS headers wrap rejections)
+app.add_middleware(AdmissionMiddleware)
+
 # CORS for frontend dev
 app.add_middleware(
     CORSMiddleware,
@@ -66,6 +66,16 @@ class Keyword(BaseModel):
     recommended_phrase: str
 
 
+class AnalysisReuse(BaseModel):
+    """How much of a previous analysis was reused for this result."""
+
+    mode: Literal["full", "delta", "cached"]
+    reused_sections: int = 0
+    changed_sections: int = 0
+    removed_sections: int = 0
+    reuse_ratio: float = Field(0.0, ge=0.0, le=1.0)
+
+
 class JdGapResult(BaseModel):
     """Result of JD gap analysis."""
 
@@ -75,6 +85,81 @@ class JdGapResult(BaseModel):
     gaps: list[Gap]
     keywords: list[Keyword]
     craft_questions: list[str]
+    analysis_id: Optional[str] = None
+    reuse: Optional[AnalysisReuse] = None
+
+
+class AnalysisSummary(BaseModel):
+    """A stored analysis in a session's history."""
+
+    analysis_id: str
+    created_at: datetime
+    target_role: Optional[str] = None
+    jd_preview: str
+    match_score: int
+    summary: str
+
+
+class AnalysisListResponse(BaseModel):
+    """Stored analyses for a session, newest first."""
+
+    session_id: str
+    analyses: list[AnalysisSummary]
+
+
+# ============================================
+# JD Corpus
+# ============================================
+
+class JdIngestItem(BaseModel):
+    """A job description to add to the local JD index."""
+
+    text: str = Field(..., min_length=50, max_length=50000)
+    title: Optional[str] = None
+    company: Optional[str] = None
+
+
+class JdIngestRequest(BaseModel):
+    """Request to add job descriptions to the local JD index."""
+
+    jds: list[JdIngestItem] = Field(..., min_length=1, max_length=1000)
+
+
+class JdIngestResponse(BaseModel):
+    """Response after indexing job descriptions."""
+
+    jd_ids: list[str]
+    total_jds: int
+
+
+class JdSearchRequest(BaseModel):
+    """Request to find the best-matching stored JDs for a session's resume."""
+
+    session_id: str
+    top_k: int = Field(10, ge=1, le=100)
+    analyze_top: int = Field(0, ge=0, le=5)
+    target_role: Optional[str] = None
+
+
+class JdMatch(BaseModel):
+    """A stored JD ranked against the resume, optionally with a gap analysis."""
+
+    jd_id: str
+    title: Optional[str] = None
+    company: Optional[str] = None
+    score: float
+    vector_score: float
+    keyword_score: float
+    matched_keywords: list[str]
+    analysis: Optional[JdGapResult] = None
+
+
+class JdSearchResponse(BaseModel):
+    """Ranked JD matches for a resume."""
+
+    matches: list[JdMatch]
+    total_jds: int
+    search_ms: float
 
 
 # ============================================
@@ -87,3 +172,15 @@ class HealthResponse(BaseModel):
     status: str = "ok"
     version: str = "1.0.0"
 
+
+class MetricsResponse(BaseModel):
+    """LLM usage and cancellation counters since process start."""
+
+    llm_calls_completed: int
+    llm_calls_cancelled: int
+    prompt_tokens: int
+    completion_tokens: int
+    avg_completion_tokens: int
+    requests_cancelled: int
+    estimated_tokens_saved: int
+
@@ -0,0 +1,124 @@
+"""Streaming text extraction for DOCX files.
+
+Reads the WordprocessingML parts straight from the zip archive with
+incremental XML parsing instead of building the python-docx object model.
+Covers body paragraphs, tables (one line per row, cells joined by " | "),
+text boxes (right after the paragraph that anchors them), headers and
+footers, in document reading order.
+"""
+
+import io
+import re
+import zipfile
+from typing import IO, Iterator
+from xml.etree.ElementTree import Element, iterparse
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+_P = f"{W_NS}p"
+_R = f"{W_NS}r"
+_T = f"{W_NS}t"
+_TAB = f"{W_NS}tab"
+_BR = f"{W_NS}br"
+_CR = f"{W_NS}cr"
+_TR = f"{W_NS}tr"
+_TC = f"{W_NS}tc"
+# Text boxes are stored twice (DrawingML + VML fallback); only read the first
+_FALLBACK = f"{MC_NS}Fallback"
+
+_HEADER_PART = re.compile(r"word/header(\d*)\.xml")
+_FOOTER_PART = re.compile(r"word/footer(\d*)\.xml")
+
+
+def _ordered_parts(names: list[str], pattern: re.Pattern) -> list[str]:
+    found = {int(m.group(1) or 0): n for n in names if (m := pattern.fullmatch(n))}
+    return [found[k] for k in sorted(found)]
+
+
+def _iter_part_paragraphs(stream: IO[bytes]) -> Iterator[str]:
+    """Yield paragraph (or table row) texts from one XML part as it is parsed.
+
+    Paragraphs and table cells form a stack of open containers. Finished text
+    goes to the innermost open container, so a text box is emitted right after
+    the paragraph that anchors it and a table inside a cell stays in that cell.
+    """
+    element_stack: list[Element] = []
+    # Open containers: (tag, own text pieces, finished nested lines)
+    containers: list[tuple[str, list[str], list[str]]] = []
+    rows: list[list[str]] = []
+    fallback_depth = 0
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            element_stack.append(elem)
+            if tag in (_P, _TC):
+                containers.append((tag, [], []))
+            elif tag == _TR:
+                rows.append([])
+            elif tag == _FALLBACK:
+                fallback_depth += 1
+            continue
+
+        element_stack.pop()
+        parent = element_stack[-1] if element_stack else None
+        lines: list[str] = []
+
+        if tag == _P:
+            _, pieces, nested = containers.pop()
+            text = "".join(pieces).strip()
+            lines = ([text] if text else []) + nested
+        elif tag == _TC:
+            _, _, nested = containers.pop()
+            if rows:
+                rows[-1].append(" ".join(nested))
+        elif tag == _TR:
+            line = " | ".join(c for c in rows.pop() if c)
+            lines = [line] if line else []
+        elif tag == _FALLBACK:
+            fallback_depth -= 1
+        elif containers and containers[-1][0] == _P and parent is not None and parent.tag == _R:
+            pieces = containers[-1][1]
+            if tag == _T:
+                pieces.append(elem.text or "")
+            elif tag == _TAB:
+                pieces.append("\t")
+            elif tag in (_BR, _CR):
+                pieces.append("\n")
+
+        if lines and fallback_depth == 0:
+            if containers:
+                containers[-1][2].extend(lines)
+            else:
+                yield from lines
+
+        # Drop finished subtrees so memory stays bounded by nesting depth
+        if parent is not None:
+            parent.remove(elem)
+
+
+def extract_docx_text(content: bytes) -> str:
+    """Extract text from DOCX bytes, paragraphs separated by blank lines."""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        names = archive.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("word/document.xml not found")
+
+        parts = (
+            _ordered_parts(names, _HEADER_PART)
+            + ["word/document.xml"]
+            + _ordered_parts(names, _FOOTER_PART)
+        )
+        texts: list[str] = []
+        seen_parts: set[tuple[str, ...]] = set()
+        for name in parts:
+            with archive.open(name) as stream:
+                part_texts = tuple(_iter_part_paragraphs(stream))
+            # First-page and default headers often repeat the same text
+            if name != "word/document.xml":
+                if part_texts in seen_parts:
+                    continue
+                seen_parts.add(part_texts)
+            texts.extend(part_texts)
+    return "\n\n".join(texts)
@@ -1,14 +1,114 @@
 """JD Gap Analysis service using OpenAI."""
 
-from typing import Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
 
+from app.core.config import settings
 from app.infra.openai_client import openai_client
-from app.schemas import Gap, JdGapResult, Keyword, Strength
+from app.infra.session_store import session_store
+from app.schemas import AnalysisReuse, Gap, JdGapResult, Keyword, Strength
+from app.services.resume_sections import SectionDiff, diff_sections, split_sections
+
+logger = logging.getLogger(__name__)
+
+_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _chunk_blocks(blocks: list[str], max_chars: int) -> list[str]:
+    """Greedily pack text blocks into chunks of at most ``max_chars``."""
+    chunks: list[str] = []
+    current = ""
+    for block in blocks:
+        # Hard-split blocks that cannot fit in any chunk on their own
+        pieces = [block[i : i + max_chars] for i in range(0, len(block), max_chars)]
+        for piece in pieces:
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _condense_resume(resume_text: str, max_chars: int) -> str:
+    """Shorten a long resume to at most ``max_chars`` while keeping every section.
+
+    Lines are kept whole. Each titled section first gets a share of the budget
+    proportional to its length (at least its first line) and keeps the leading
+    lines that fit; budget left over then goes to the next unkept lines in
+    document order. Text with no recognized headings is one block, without
+    synthetic headers.
+    """
+    if len(resume_text) <= max_chars:
+        return resume_text
+    sections = split_sections(resume_text)
+    if not sections or sections[0].positional:
+        blocks = [("", [line for s in sections for line in s.body.splitlines() if line.strip()])]
+    else:
+        blocks = [
+            (f"### {s.title}\n", [line for line in s.body.splitlines() if line.strip()])
+            for s in sections
+        ]
+
+    # Headers and block separators are always kept; lines cost their length + newline
+    used = sum(len(header) + 2 for header, _ in blocks)
+    total = sum(len(line) + 1 for _, lines in blocks for line in lines) or 1
+    budget = max(0, max_chars - used)
+    kept = [0] * len(blocks)
+    for i, (_, lines) in enumerate(blocks):
+        # Short sections (e.g. a one-line skills list) always keep their first line
+        share = budget * sum(len(line) + 1 for line in lines) // total
+        if lines:
+            share = max(share, len(lines[0]) + 1)
+        spent = 0
+        while (
+            kept[i] < len(lines)
+            and spent + len(lines[kept[i]]) + 1 <= share
+            and used + len(lines[kept[i]]) + 1 <= max_chars
+        ):
+            spent += len(lines[kept[i]]) + 1
+            used += len(lines[kept[i]]) + 1
+            kept[i] += 1
+    for i, (_, lines) in enumerate(blocks):
+        while kept[i] < len(lines) and used + len(lines[kept[i]]) + 1 <= max_chars:
+            used += len(lines[kept[i]]) + 1
+            kept[i] += 1
+
+    if not any(kept):
+        return resume_text[:max_chars]
+    condensed = "\n\n".join(
+        header + "\n".join(lines[:n]) for (header, lines), n in zip(blocks, kept)
+    )
+    return condensed[:max_chars]
+
+
+def _dedupe_key(text: str) -> str:
+    return _NON_WORD.sub("", text.lower())
+
+
+@dataclass
+class _SharedAnalysis:
+    """An in-flight analysis and the number of requests awaiting it."""
+
+    task: asyncio.Future
+    waiters: int = 0
 
 
 class JdGapService:
     """Analyzes gap between resume and job description using LLM."""
 
+    def __init__(self):
+        self._inflight: dict[tuple[str, str, str], _SharedAnalysis] = {}
+
     SYSTEM_PROMPT = """你是一位资深的求职顾问和简历专家。你的任务是分析求职者的简历与目标职位描述(JD)之间的匹配度。
 
 请基于以下维度进行分析：
@@ -40,37 +140,64 @@ class JdGapService:
 - craft_questions 数量为 2-4 个，用于帮助求职者补充更多有效信息
 - 所有内容使用中文"""
 
+    DELTA_SYSTEM_PROMPT = """你是一位资深的求职顾问和简历专家。求职者修改了简历的部分章节，你之前已经针对同一职位描述(JD)完成过一次完整分析。
+
+你将收到：
+1. 上一次的分析结果(JSON)
+2. 简历中新增或修改过的章节
+3. 已被删除的章节标题
+
+请只根据这些变化更新分析结果：未变化的章节视为与上次相同，不要无故改动与变化无关的条目。
+你必须返回一个与上一次分析结果格式完全相同的、更新后的完整JSON对象（包含 match_score、summary、strengths、gaps、keywords、craft_questions）。
+所有内容使用中文。"""
+
     def _build_user_prompt(
         self,
         resume_text: str,
         jd_text: str,
         target_role: Optional[str] = None,
+        part_info: str = "",
     ) -> str:
         role_info = f"目标岗位：{target_role}\n\n" if target_role else ""
-        return f"""{role_info}## 简历内容
-{resume_text[:8000]}
+        return f"""{role_info}{part_info}## 简历内容
+{resume_text[:settings.analysis_resume_chars]}
 
 ## 职位描述 (JD)
-{jd_text[:8000]}
+{jd_text[:settings.analysis_chunk_chars]}
 
 请分析简历与JD的匹配情况，并返回JSON格式的分析结果。"""
 
-    async def analyze(
+    def _build_delta_prompt(
         self,
-        resume_text: str,
-        jd_text: str,
+        prior: JdGapResult,
+        diff: SectionDiff,
         target_role: Optional[str] = None,
-        api_key: Optional[str] = None,
-    ) -> JdGapResult:
-        """Perform JD gap analysis."""
-        messages = [
-            {"role": "system", "content": self.SYSTEM_PROMPT},
-            {"role": "user", "content": self._build_user_prompt(resume_text, jd_text, target_role)},
-        ]
+    ) -> str:
+        role_info = f"目标岗位：{target_role}\n\n" if target_role else ""
+        changed = "\n\n".join(s.render() for s in diff.changed) or "(无)"
+        removed = "\n".join(f"- {s.title}" for s in diff.removed) or "(无)"
+        prior_json = json.dumps(
+            prior.model_dump(exclude={"reuse", "analysis_id"}), ensure_ascii=False
+        )
+        return f"""{role_info}## 上一次的分析结果
+{prior_json}
 
-        result = await openai_client.chat_json(messages, temperature=0.5, api_key=api_key)
+## 新增或修改的简历章节
+{changed[:settings.incremental_changed_chars]}
+
+## 已删除的简历章节
+{removed}
 
-        # Validate and transform to pydantic model
+请根据以上变化更新分析结果，并返回完整的JSON。"""
+
+    @staticmethod
+    def jd_hash(jd_text: str, target_role: Optional[str] = None) -> str:
+        """Stable key for a JD (and target role) used to look up prior analyses."""
+        key = f"{target_role or ''}\n{' '.join(jd_text.split())}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def _to_result(self, result: dict[str, Any]) -> JdGapResult:
+        """Validate raw LLM output and transform it to the pydantic model."""
         return JdGapResult(
             match_score=int(result.get("match_score", 50)),
             summary=result.get("summary", "分析完成"),
@@ -97,6 +224,231 @@ class JdGapService:
             craft_questions=result.get("craft_questions", []),
         )
 
+    async def analyze(
+        self,
+        resume_text: str,
+        jd_text: str,
+        target_role: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> JdGapResult:
+        """Perform JD gap analysis, in parallel JD chunks when the JD is long."""
+        resume_text = _condense_resume(resume_text, settings.analysis_resume_chars)
+        if len(jd_text) > settings.analysis_chunk_chars:
+            return await self.analyze_chunked(resume_text, jd_text, target_role, api_key)
+
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": self._build_user_prompt(resume_text, jd_text, target_role)},
+        ]
+
+        result = await openai_client.chat_json(messages, temperature=0.5, api_key=api_key)
+        return self._to_result(result)
+
+    async def analyze_chunked(
+        self,
+        resume_text: str,
+        jd_text: str,
+        target_role: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> JdGapResult:
+        """Map-reduce analysis for long JDs.
+
+        The JD is split on paragraph boundaries and each chunk is analyzed
+        concurrently against the whole resume (condensed by ``analyze``), so the number of
+        calls grows only with the JD length. Results are merged locally, so
+        wall-clock time stays close to a single call.
+        """
+        limit = settings.analysis_chunk_chars
+        jd_chunks = _chunk_blocks([b for b in re.split(r"\n\s*\n", jd_text) if b.strip()], limit)
+        jd_chunks = jd_chunks or [jd_text[:limit]]
+
+        async def analyze_chunk(i: int) -> JdGapResult:
+            part_info = (
+                f"注意：以下为较长JD的第 {i + 1}/{len(jd_chunks)} 部分，"
+                f"只需分析简历与这部分JD的匹配情况。\n\n"
+            )
+            messages = [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": self._build_user_prompt(
+                        resume_text, jd_chunks[i], target_role, part_info
+                    ),
+                },
+            ]
+            result = await openai_client.chat_json(messages, temperature=0.5, api_key=api_key)
+            return self._to_result(result)
+
+        logger.info(f"Chunked analysis: {len(jd_chunks)} JD chunks")
+        results = await asyncio.gather(*(analyze_chunk(i) for i in range(len(jd_chunks))))
+        return self._merge_results(results, [len(c) for c in jd_chunks])
+
+    def _merge_results(
+        self,
+        results: list[JdGapResult],
+        jd_chunk_weights: list[int],
+    ) -> JdGapResult:
+        """Combine chunk results into one, deduplicating list items."""
+        total_weight = sum(jd_chunk_weights) or 1
+        match_score = round(
+            sum(r.match_score * w for r, w in zip(results, jd_chunk_weights))
+            / total_weight
+        )
+
+        def unique(items, key):
+            seen = set()
+            for item in items:
+                k = _dedupe_key(key(item))
+                if k and k not in seen:
+                    seen.add(k)
+                    yield item
+
+        strengths = list(unique((s for r in results for s in r.strengths), lambda s: s.point))
+        gaps = list(unique((g for r in results for g in r.gaps), lambda g: g.point))
+        gaps.sort(key=lambda g: _PRIORITY_ORDER.get(g.priority, 1))
+
+        # Prefer keyword entries that found evidence in the resume
+        keywords: dict[str, Keyword] = {}
+        for keyword in (k for r in results for k in r.keywords):
+            key = _dedupe_key(keyword.jd_keyword)
+            if key and (key not in keywords or (keyword.evidence and not keywords[key].evidence)):
+                keywords[key] = keyword
+
+        questions = list(unique((q for r in results for q in r.craft_questions), lambda q: q))
+        summaries = list(unique((r.summary for r in results), lambda s: s))
+
+        return JdGapResult(
+            match_score=max(0, min(100, match_score)),
+            summary="；".join(summaries[:2]),
+            strengths=strengths[:8],
+            gaps=gaps[:8],
+            keywords=list(keywords.values())[:12],
+            craft_questions=questions[:4],
+        )
+
+    async def analyze_incremental(
+        self,
+        session_id: str,
+        resume_text: str,
+        jd_text: str,
+        target_role: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> JdGapResult:
+        """Analyze a resume against a JD, sharing identical in-flight analyses.
+
+        Concurrent requests for the same session, JD and resume await one
+        analysis. If a caller is cancelled (e.g. its client disconnected), the
+        shared work and its upstream LLM calls are cancelled only when no other
+        caller is still waiting for the result.
+        """
+        resume_hash = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+        key = (session_id, self.jd_hash(jd_text, target_role), resume_hash)
+        shared = self._inflight.get(key)
+        if shared is None:
+            task = asyncio.ensure_future(
+                self._analyze_incremental(session_id, resume_text, jd_text, target_role, api_key)
+            )
+            shared = self._inflight[key] = _SharedAnalysis(task=task)
+
+            def forget(_: asyncio.Future) -> None:
+                if self._inflight.get(key) is shared:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        except asyncio.CancelledError:
+            if shared.waiters == 1 and not shared.task.done():
+                logger.info(f"Cancelling analysis for session {session_id}: no waiters left")
+                # Later identical requests must start fresh, not join a dying task
+                if self._inflight.get(key) is shared:
+                    del self._inflight[key]
+                shared.task.cancel()
+            raise
+        finally:
+            shared.waiters -= 1
+
+    async def _analyze_incremental(
+        self,
+        session_id: str,
+        resume_text: str,
+        jd_text: str,
+        target_role: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> JdGapResult:
+        """Analyze a resume against a JD, reusing the session's previous analysis.
+
+        If the resume is unchanged since the last analysis of this JD the stored
+        result is returned as-is. If only some sections changed, just those are
+        sent together with the prior result and the update is merged back.
+        Otherwise a full analysis is run.
+        """
+        analysis_id = self.jd_hash(jd_text, target_role)
+        prior: Optional[JdGapResult] = None
+        prior_body = session_store.load_analysis_body(session_id, analysis_id)
+        prior_resume_text = session_store.load_analysis_resume_text(session_id, analysis_id)
+        if prior_body and prior_resume_text is not None:
+            try:
+                prior = JdGapResult.model_validate_json(gzip.decompress(prior_body))
+            except (OSError, EOFError, ValueError):
+                prior = None
+
+        if prior is None:
+            result = await self.analyze(resume_text, jd_text, target_role, api_key)
+            result.reuse = AnalysisReuse(
+                mode="full", changed_sections=len(split_sections(resume_text))
+            )
+        else:
+            diff = diff_sections(prior_resume_text, resume_text)
+            reuse = AnalysisReuse(
+                mode="cached",
+                reused_sections=len(diff.unchanged),
+                changed_sections=len(diff.changed),
+                removed_sections=len(diff.removed),
+                reuse_ratio=round(1.0 - diff.changed_ratio, 3),
+            )
+            if not diff.has_changes:
+                reuse.reuse_ratio = 1.0
+                return prior.model_copy(update={"reuse": reuse})
+
+            if diff.changed_ratio > settings.incremental_max_changed_ratio:
+                result = await self.analyze(resume_text, jd_text, target_role, api_key)
+                reuse.mode = "full"
+                reuse.reuse_ratio = 0.0
+            else:
+                messages = [
+                    {"role": "system", "content": self.DELTA_SYSTEM_PROMPT},
+                    {"role": "user", "content": self._build_delta_prompt(prior, diff, target_role)},
+                ]
+                delta = await openai_client.chat_json(messages, temperature=0.5, api_key=api_key)
+                merged = prior.model_dump(exclude={"reuse", "analysis_id"})
+                merged.update({k: v for k, v in delta.items() if k in merged and v is not None})
+                result = self._to_result(merged)
+                reuse.mode = "delta"
+            result.reuse = reuse
+            logger.info(
+                f"Re-analysis for session {session_id}: mode={reuse.mode}, "
+                f"changed={reuse.changed_sections}, reused={reuse.reused_sections}"
+            )
+
+        result.analysis_id = analysis_id
+        session_store.save_analysis(
+            session_id,
+            analysis_id,
+            body=result.model_dump_json(exclude={"reuse"}).encode("utf-8"),
+            resume_text=resume_text,
+            meta={
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "target_role": target_role,
+                "jd_preview": " ".join(jd_text.split())[:120],
+                "match_score": result.match_score,
+                "summary": result.summary,
+            },
+        )
+        return result
+
 
 # Singleton instance
 jd_gap_service = JdGapService()
@@ -0,0 +1,82 @@
+"""Resume-to-JD search over the local JD corpus."""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.infra.jd_index import jd_index
+from app.schemas import JdIngestItem, JdIngestResponse, JdMatch, JdSearchResponse
+from app.services.jd_gap_service import jd_gap_service
+
+logger = logging.getLogger(__name__)
+
+
+class JdMatchService:
+    """Indexes JDs and shortlists them for a resume before any LLM analysis."""
+
+    def ingest(self, items: list[JdIngestItem]) -> JdIngestResponse:
+        """Add job descriptions to the local index."""
+        jd_ids = jd_index.add([item.model_dump() for item in items])
+        logger.info(f"Indexed {len(jd_ids)} JDs, corpus size: {len(jd_index)}")
+        return JdIngestResponse(jd_ids=jd_ids, total_jds=len(jd_index))
+
+    async def search(
+        self,
+        session_id: str,
+        resume_text: str,
+        top_k: int = 10,
+        analyze_top: int = 0,
+        target_role: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> JdSearchResponse:
+        """Rank stored JDs for a resume and run gap analysis on the top few."""
+        started = time.perf_counter()
+        # Index loading and scoring are CPU and disk bound; keep them off the event loop
+        hits = await run_in_threadpool(jd_index.search, resume_text, top_k)
+        search_ms = (time.perf_counter() - started) * 1000
+
+        matches = [
+            JdMatch(
+                jd_id=hit.record.jd_id,
+                title=hit.record.title,
+                company=hit.record.company,
+                score=round(hit.score, 4),
+                vector_score=round(hit.vector_score, 4),
+                keyword_score=round(hit.keyword_score, 4),
+                matched_keywords=hit.matched_keywords,
+            )
+            for hit in hits
+        ]
+
+        shortlisted = hits[:analyze_top]
+        if shortlisted:
+            jd_texts = await run_in_threadpool(
+                lambda: [jd_index.load_text(hit.record) for hit in shortlisted]
+            )
+            analyses = await asyncio.gather(
+                *(
+                    jd_gap_service.analyze_incremental(
+                        session_id=session_id,
+                        resume_text=resume_text,
+                        jd_text=jd_text,
+                        target_role=target_role,
+                        api_key=api_key,
+                    )
+                    for jd_text in jd_texts
+                )
+            )
+            for match, analysis in zip(matches, analyses):
+                match.analysis = analysis
+
+        return JdSearchResponse(
+            matches=matches,
+            total_jds=len(jd_index),
+            search_ms=round(search_ms, 2),
+        )
+
+
+# Singleton instance
+jd_match_service = JdMatchService()
@@ -0,0 +1,131 @@
+"""Split resume text into sections and diff two resume versions."""
+
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Common resume section headings (compared case-insensitively, trailing colon stripped)
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "about me",
+    "education", "experience", "work experience", "professional experience",
+    "employment", "internships", "projects", "skills", "technical skills",
+    "certifications", "awards", "honors", "publications", "activities",
+    "leadership", "languages", "interests", "volunteer",
+    "个人信息", "基本信息", "个人简介", "自我评价", "求职意向",
+    "教育背景", "教育经历", "工作经历", "工作经验", "实习经历",
+    "项目经历", "项目经验", "专业技能", "技能", "技能证书",
+    "获奖情况", "荣誉奖项", "证书", "校园经历", "社会实践", "论文发表",
+}
+
+_BLOCK_SPLIT = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class ResumeSection:
+    """A titled block of resume text.
+
+    ``positional`` sections have generated titles ("Paragraph N") that shift when
+    paragraphs are inserted, so only their body is compared.
+    """
+
+    title: str
+    body: str
+    positional: bool = False
+
+    @property
+    def digest(self) -> str:
+        """Hash of the body only; titles are matched separately."""
+        normalized = " ".join(self.body.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @property
+    def match_key(self) -> tuple[str, str]:
+        return (self.digest, "" if self.positional else self.title)
+
+    def render(self) -> str:
+        return f"### {self.title}\n{self.body}" if self.body else f"### {self.title}"
+
+
+@dataclass
+class SectionDiff:
+    """Result of comparing two resume versions section by section."""
+
+    unchanged: list[ResumeSection] = field(default_factory=list)
+    changed: list[ResumeSection] = field(default_factory=list)
+    removed: list[ResumeSection] = field(default_factory=list)
+
+    @property
+    def changed_ratio(self) -> float:
+        """Share of the new resume's characters that live in changed sections."""
+        changed_chars = sum(len(s.body) + len(s.title) for s in self.changed)
+        total_chars = changed_chars + sum(len(s.body) + len(s.title) for s in self.unchanged)
+        return changed_chars / total_chars if total_chars else 0.0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 40:
+        return False
+    return line.rstrip(":：").strip().lower() in SECTION_HEADINGS
+
+
+def split_sections(text: str) -> list[ResumeSection]:
+    """Split resume text into heading-delimited sections.
+
+    Headings are detected line by line, so text extracted from PDFs (one line
+    per text line, no blank lines between blocks) is split too. Text before the
+    first heading becomes a "Header" section. When no headings are recognized,
+    every paragraph (or line, if there are no blank lines) is treated as its
+    own section so edits can still be localized.
+    """
+    lines = text.splitlines()
+    if not any(_is_heading(line) for line in lines):
+        blocks = [b.strip() for b in _BLOCK_SPLIT.split(text) if b.strip()]
+        if len(blocks) <= 1:
+            blocks = [line.strip() for line in lines if line.strip()]
+        return [
+            ResumeSection(title=f"Paragraph {i + 1}", body=b, positional=True)
+            for i, b in enumerate(blocks)
+        ]
+
+    sections: list[ResumeSection] = []
+    title = "Header"
+    body: list[str] = []
+    for line in lines:
+        if _is_heading(line):
+            sections.append(ResumeSection(title=title, body="\n".join(body).strip()))
+            title = line.strip().rstrip(":：").strip()
+            body = []
+        else:
+            body.append(line)
+    sections.append(ResumeSection(title=title, body="\n".join(body).strip()))
+    return [s for s in sections if s.body or s.title != "Header"]
+
+
+def diff_sections(old_text: str, new_text: str) -> SectionDiff:
+    """Compare two resume versions by section content."""
+    old_sections = split_sections(old_text)
+    new_sections = split_sections(new_text)
+    remaining = Counter(s.match_key for s in old_sections)
+
+    diff = SectionDiff()
+    for section in new_sections:
+        if remaining[section.match_key] > 0:
+            remaining[section.match_key] -= 1
+            diff.unchanged.append(section)
+        else:
+            diff.changed.append(section)
+
+    # Unmatched old sections whose heading still exists were edited, not removed
+    changed_titles = {s.title for s in diff.changed}
+    for section in old_sections:
+        if remaining[section.match_key] > 0:
+            remaining[section.match_key] -= 1
+            if section.title not in changed_titles:
+                diff.removed.append(section)
+    return diff
@@ -5,6 +5,7 @@ from typing import Literal
 
 from app.infra.session_store import session_store
 from app.schemas import ResumeUploadResponse
+from app.services.docx_extractor import extract_docx_text
 
 
 class ResumeService:
@@ -66,16 +67,9 @@ class ResumeService:
             raise ValueError(f"Failed to parse PDF: {str(e)}")
 
     def _parse_docx(self, content: bytes) -> str:
-        """Extract text from DOCX."""
+        """Extract text from DOCX, including tables, headers and text boxes."""
         try:
-            from docx import Document
-
-            doc = Document(io.BytesIO(content))
-            texts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    texts.append(para.text)
-            return "\n\n".join(texts)
+            return extract_docx_text(content)
         except Exception as e:
             raise ValueError(f"Failed to parse DOCX: {str(e)}")
 
@@ -0,0 +1,80 @@
+"""Benchmark the streaming DOCX extractor against the python-docx parser.
+
+Builds synthetic resumes of increasing size (body paragraphs, a skills table
+and a header) and reports time per parse, peak traced memory and how many
+characters each approach extracts. Peak memory comes from tracemalloc, which
+does not see lxml's C-level tree, so the python-docx figure is understated.
+
+Requires python-docx, which the app itself no longer needs:
+
+    pip install python-docx
+    python scripts/bench_docx.py
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from docx import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.docx_extractor import extract_docx_text  # noqa: E402
+
+
+def build_docx(paragraphs: int) -> bytes:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com | +1 555 0100"
+    doc.add_heading("Experience", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(
+            f"Bullet {i}: Built data pipelines in Python and SQL processing "
+            f"{i * 1000} records per day with Kubernetes, Kafka and Spark."
+        )
+    doc.add_heading("Skills", level=1)
+    table = doc.add_table(rows=0, cols=2)
+    for i in range(max(paragraphs // 10, 1)):
+        row = table.add_row().cells
+        row[0].text = f"Area {i}"
+        row[1].text = "Python, Go, Rust, PostgreSQL, Redis, AWS"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def parse_python_docx(content: bytes) -> str:
+    """The previous ResumeService._parse_docx implementation."""
+    doc = Document(io.BytesIO(content))
+    return "\n\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
+def measure(parse, content: bytes, repeat: int) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = parse(content)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024 / 1024, len(text)
+
+
+def main() -> None:
+    print(f"{'paragraphs':>10} {'size KB':>8} | {'parser':<12} {'ms':>8} {'peak MB':>8} {'chars':>9}")
+    for paragraphs in (50, 500, 5000, 20000):
+        content = build_docx(paragraphs)
+        repeat = 20 if paragraphs <= 500 else 3
+        for name, parse in (("python-docx", parse_python_docx), ("streaming", extract_docx_text)):
+            ms, peak_mb, chars = measure(parse, content, repeat)
+            print(
+                f"{paragraphs:>10} {len(content) / 1024:>8.0f} | "
+                f"{name:<12} {ms:>8.1f} {peak_mb:>8.1f} {chars:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,14 @@ export interface Keyword {
   recommended_phrase: string;
 }
 
+export interface AnalysisReuse {
+  mode: 'full' | 'delta' | 'cached';
+  reused_sections: number;
+  changed_sections: number;
+  removed_sections: number;
+  reuse_ratio: number;
+}
+
 export interface JdGapResult {
   match_score: number;
   summary: string;
@@ -69,6 +77,8 @@ export interface JdGapResult {
   gaps: Gap[];
   keywords: Keyword[];
   craft_questions: string[];
+  analysis_id?: string;
+  reuse?: AnalysisReuse;
 }
 
 // ============================================